@@ -2,16 +2,54 @@
 Simple Credit Card Spending Analyzer
 """
 
+import re
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _accumulate(month_codes, category_codes, amounts, n_months, n_categories):
+        """Sum amounts into a (months x categories) matrix"""
+        out = np.zeros((n_months, n_categories))
+        for i in range(amounts.shape[0]):
+            out[month_codes[i], category_codes[i]] += amounts[i]
+        return out
+else:
+    def _accumulate(month_codes, category_codes, amounts, n_months, n_categories):
+        """Sum amounts into a (months x categories) matrix"""
+        flat = month_codes * n_categories + category_codes
+        out = np.bincount(flat, weights=amounts, minlength=n_months * n_categories)
+        return out.reshape(n_months, n_categories)
+
+
 class SpendingAnalyzer:
+    CHUNK_SIZE = 100_000
+    
     def __init__(self):
         self.data = None
         self.folder_path = None
+        self._cache = {}
         
         self.category_patterns = {
             'Groceries': ['WAL-MART', 'THIARA', 'SOBEYS', 'IQBAL FOODS', 'VOILA', 'FRILLS'],
@@ -22,70 +60,178 @@ class SpendingAnalyzer:
             "Food": ["TST", "SQ", "POPEYES", "MARY", "TEXAS", "CHICKEN", "COFFEE", "TEA", "TIM HORTONS", "CHA", "PIZZA"],
             "Gas": ["Petro", "Esso"]
         }
+        
+        # One compiled alternation per category, matched against upper-cased payees
+        self._category_regexes = {
+            category: re.compile('|'.join(re.escape(pattern.upper()) for pattern in patterns))
+            for category, patterns in self.category_patterns.items()
+        }
+        self._automaton = self._build_automaton()
+    
+    def _build_automaton(self):
+        """Aho-Corasick automaton over all patterns (needs pyahocorasick)"""
+        if ahocorasick is None:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for priority, (category, patterns) in enumerate(self.category_patterns.items()):
+            for pattern in patterns:
+                word = pattern.upper()
+                if not automaton.exists(word):
+                    automaton.add_word(word, (priority, category))
+        
+        automaton.make_automaton()
+        return automaton
     
     def load_csvs_from_folder(self, folder_path):
         """Load all CSV files"""
+        self._cache.clear()
         self.folder_path = Path(folder_path)
         csv_files = list(self.folder_path.glob('*.csv'))
         
         if not csv_files:
             raise ValueError("No CSV files found")
         
-        all_data = []
-        for csv_file in csv_files:
-            df = pd.read_csv(csv_file)
-            all_data.append(df)
+        # Both CSV engines release the GIL, so statements parse in parallel
+        with ThreadPoolExecutor(max_workers=min(8, len(csv_files))) as executor:
+            all_data = list(executor.map(self._read_csv, csv_files))
         
         self.data = pd.concat(all_data, ignore_index=True)
         self.process_data()
         return len(csv_files)
     
+    def _read_csv(self, csv_file):
+        """Read one statement's expenses - only the columns we use, with fixed dtypes"""
+        options = dict(
+            usecols=['Posted Date', 'Payee', 'Amount'],
+            parse_dates=['Posted Date'],
+            date_format='%m/%d/%Y'
+        )
+        
+        # Arrow's multithreaded reader and string kernels when pyarrow is installed,
+        # but it has no chunksize - each statement is read whole
+        if pyarrow is not None:
+            chunks = [pd.read_csv(
+                csv_file,
+                dtype={'Payee': 'string[pyarrow]', 'Amount': 'float64'},
+                engine='pyarrow',
+                **options
+            )]
+        else:
+            chunks = pd.read_csv(
+                csv_file,
+                dtype={'Payee': 'string', 'Amount': 'float64'},
+                engine='c',
+                chunksize=self.CHUNK_SIZE,
+                **options
+            )
+        
+        # Expenses only - drop payments before the raw rows pile up
+        return pd.concat(
+            [chunk.loc[chunk['Amount'].to_numpy() <= 0] for chunk in chunks],
+            ignore_index=True
+        )
+    
     def process_data(self):
-        """Process data - expenses only"""
+        """Process data - derive columns for the expense rows"""
+        # read_csv leaves unparseable dates as text - no-op if already parsed,
+        # otherwise a clear format error instead of a .dt failure below
         self.data['Posted Date'] = pd.to_datetime(self.data['Posted Date'], format='%m/%d/%Y')
-        self.data['Type'] = self.data['Amount'].apply(lambda x: 'Payment' if x > 0 else 'Expense')
-        self.data['Abs_Amount'] = abs(self.data['Amount'])
-        self.data['Category'] = self.data['Payee'].apply(self.categorize_transaction)
-        self.data['Month'] = self.data['Posted Date'].dt.strftime('%Y-%m')
-        self.data = self.data.sort_values('Posted Date')
-        
-        # Expenses only
-        self.data = self.data[self.data['Type'] == 'Expense'].copy()
+        self.data['Abs_Amount'] = np.abs(self.data['Amount'].to_numpy())
+        self.data['Category'] = pd.Categorical(
+            self.categorize_payees(self.data['Payee']),
+            categories=list(self.category_patterns.keys()) + ['Other']
+        )
+        self.data['Month'] = self.data['Posted Date'].dt.to_period('M')
     
     def categorize_transaction(self, payee):
         """Categorize transaction"""
-        payee_upper = payee.upper()
-        
-        for category, patterns in self.category_patterns.items():
-            if any(pattern in payee_upper for pattern in patterns):
+        return self._match_category(payee.upper())
+    
+    def _match_category(self, payee_upper):
+        """Category of an upper-cased payee - first matching category wins"""
+        if self._automaton is not None:
+            hits = [value for _, value in self._automaton.iter(payee_upper)]
+            return min(hits)[1] if hits else 'Other'
+        
+        for category, regex in self._category_regexes.items():
+            if regex.search(payee_upper):
                 return category
         
         return 'Other'
     
+    def categorize_payees(self, payees):
+        """Categorize a whole Payee column - each distinct payee only once"""
+        unique_payees = pd.Series(payees.unique())
+        
+        # One vectorized upper() - Arrow's string kernel for string[pyarrow]
+        upper_payees = unique_payees.str.upper()
+        
+        lookup = dict(zip(unique_payees, map(self._match_category, upper_payees)))
+        return payees.map(lookup)
+    
+    def _cached(self, key, compute):
+        """Memoize a result until the next load"""
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+    
     def get_monthly_spending(self):
         """Total spending by month"""
-        return self.data.groupby('Month')['Abs_Amount'].sum().round(2)
+        return self._cached(
+            'monthly_spending',
+            lambda: self.data.groupby('Month')['Abs_Amount'].sum().round(2)
+        )
     
     def get_monthly_average(self):
         """Average spending per month"""
-        monthly_totals = self.get_monthly_spending()
-        return monthly_totals.mean().round(2)
+        return self._cached(
+            'monthly_average',
+            lambda: self.get_monthly_spending().mean().round(2)
+        )
     
     def get_category_by_month(self):
         """Category breakdown by month"""
-        pivot = self.data.pivot_table(
-            values='Abs_Amount',
-            index='Month',
-            columns='Category',
-            aggfunc='sum',
-            fill_value=0
+        return self._cached('category_by_month', self._compute_category_by_month)
+    
+    def _compute_category_by_month(self):
+        """Uncached category breakdown"""
+        month_codes, months = pd.factorize(self.data['Month'], sort=True)
+        categories = self.data['Category'].cat
+        category_codes = categories.codes.to_numpy().astype(np.intp)
+        amounts = self.data['Abs_Amount'].to_numpy()
+        
+        # Rows without a month (NaT) get code -1 - leave them out, like groupby
+        valid = month_codes >= 0
+        month_codes = month_codes[valid]
+        category_codes = category_codes[valid]
+        amounts = amounts[valid]
+        
+        totals = _accumulate(
+            month_codes,
+            category_codes,
+            amounts,
+            len(months),
+            len(categories.categories)
+        )
+        
+        # Observed categories only, like a groupby with observed=True
+        observed = np.bincount(category_codes, minlength=len(categories.categories)) > 0
+        breakdown = pd.DataFrame(
+            totals[:, observed],
+            index=pd.Index(months, name='Month'),
+            columns=pd.Index(categories.categories[observed], name='Category')
         ).round(2)
         
-        pivot['TOTAL'] = pivot.sum(axis=1)
-        return pivot
+        breakdown['TOTAL'] = breakdown.sum(axis=1)
+        return breakdown
     
     def get_summary_stats(self):
         """Summary stats"""
+        return self._cached('summary_stats', self._compute_summary_stats)
+    
+    def _compute_summary_stats(self):
+        """Uncached summary stats"""
         return {
             'total_expenses': self.data['Abs_Amount'].sum(),
             'num_transactions': len(self.data),
@@ -97,7 +243,10 @@ class SpendingAnalyzer:
     
     def get_top_merchants(self, n=10):
         """Top merchants"""
-        return self.data.groupby('Payee')['Abs_Amount'].sum().sort_values(ascending=False).head(n).round(2)
+        return self._cached(
+            ('top_merchants', n),
+            lambda: self.data.groupby('Payee')['Abs_Amount'].sum().sort_values(ascending=False).head(n).round(2)
+        )
 
 
 class SpendingAnalyzerGUI:
@@ -109,6 +258,9 @@ class SpendingAnalyzerGUI:
         self.analyzer = SpendingAnalyzer()
         self.folder_path = None
         
+        # Tab text -> needs redraw; nothing to draw until data is loaded
+        self._tab_dirty = {}
+        
         self.setup_ui()
     
     def setup_ui(self):
@@ -131,6 +283,14 @@ class SpendingAnalyzerGUI:
         self.create_merchants_tab()
         self.create_transactions_tab()
         
+        self._tab_updaters = {
+            'Summary': self.update_summary,
+            'Monthly': self.update_monthly,
+            'Top Merchants': self.update_merchants,
+            'All Transactions': self.update_transactions
+        }
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_change)
+        
         self.auto_load_data()
     
     def create_summary_tab(self):
@@ -222,18 +382,32 @@ class SpendingAnalyzerGUI:
             messagebox.showwarning("No Folder", "Select a folder first!")
             return
         
+        # Nothing to redraw from a load that fails part-way
+        self._tab_dirty = {}
+        
         try:
             num_files = self.analyzer.load_csvs_from_folder(self.folder_path)
             messagebox.showinfo("Success", f"Loaded {num_files} CSV(s)!")
             
-            self.update_summary()
-            self.update_monthly()
-            self.update_merchants()
-            self.update_transactions()
+            # Only the visible tab is drawn now, the rest when first opened
+            self._tab_dirty = dict.fromkeys(self._tab_updaters, True)
+            self._on_tab_change()
             
         except Exception as e:
             messagebox.showerror("Error", f"Error: {str(e)}")
     
+    def _on_tab_change(self, event=None):
+        """Redraw the selected tab if its data is stale"""
+        tab = self.notebook.tab(self.notebook.select(), 'text')
+        if not self._tab_dirty.get(tab):
+            return
+        
+        try:
+            self._tab_updaters[tab]()
+            self._tab_dirty[tab] = False
+        except Exception as e:
+            messagebox.showerror("Error", f"Error: {str(e)}")
+    
     def update_summary(self):
         """Update summary"""
         stats = self.analyzer.get_summary_stats()
@@ -265,8 +439,7 @@ Monthly Average:    ${stats['monthly_average']:,.2f}  ({stats['num_months']} mon
 
 """
         
-        for month, total in monthly_total.items():
-            text += f"{month}:  ${total:,.2f}\n"
+        text += monthly_total.rename(index=str).to_string(header=False, float_format='${:,.2f}'.format) + "\n"
         
         text += f"\n{'-'*40}\n"
         text += f"Monthly Average:  ${monthly_avg:,.2f}\n"
@@ -275,24 +448,9 @@ Monthly Average:    ${stats['monthly_average']:,.2f}  ({stats['num_months']} mon
         text += f"CATEGORY BREAKDOWN BY MONTH\n"
         text += f"{'='*60}\n\n"
         
-        # Header
-        categories = [col for col in category_by_month.columns if col != 'TOTAL']
-        header = f"{'Month':<12}"
-        for cat in categories:
-            header += f"{cat:<15}"
-        header += f"{'TOTAL':<15}\n"
-        text += header
-        text += "-"*100 + "\n"
-        
-        # Rows
-        for month in category_by_month.index:
-            row = f"{month:<12}"
-            for cat in categories:
-                val = category_by_month.loc[month, cat]
-                row += f"${val:>12,.2f} "
-            total_val = category_by_month.loc[month, 'TOTAL']
-            row += f"${total_val:>12,.2f}\n"
-            text += row
+        # Month as the corner label, so the header is a single line
+        table = category_by_month.rename_axis(index=None, columns='Month')
+        text += table.to_string(float_format='${:,.2f}'.format, col_space=12) + "\n"
         
         self.monthly_text.delete(1.0, tk.END)
         self.monthly_text.insert(1.0, text)
@@ -308,16 +466,18 @@ Monthly Average:    ${stats['monthly_average']:,.2f}  ({stats['num_months']} mon
     
     def update_transactions(self):
         """Update transactions"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        for _, row in self.analyzer.data.iterrows():
-            self.tree.insert('', tk.END, values=(
-                row['Posted Date'].strftime('%Y-%m-%d'),
-                row['Payee'][:50],
-                row['Category'],
-                f"${row['Abs_Amount']:.2f}"
-            ))
+        self.tree.delete(*self.tree.get_children())
+        
+        # Format whole columns up front, then insert plain tuples
+        data = self.analyzer.data.sort_values('Posted Date', kind='stable')
+        rows = zip(
+            data['Posted Date'].dt.strftime('%Y-%m-%d'),
+            data['Payee'].str.slice(0, 50),
+            data['Category'],
+            data['Abs_Amount'].map('${:.2f}'.format)
+        )
+        for values in rows:
+            self.tree.insert('', tk.END, values=values)
 
 
 def main():